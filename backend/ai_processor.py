@@ -1,24 +1,103 @@
+import asyncio
+import logging
 import os
 import re
-import json
+import threading
+import time
 import uuid
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
+import httpx
+import msgspec
+import orjson
+
+from . import semantic_cache
+from .cache import LRUCache, content_key
 from .config import settings
-from .models import DigitalProductPassport, Material
+from .models import DigitalProductPassport, load_trusted_dpp
 
 # Optional OpenAI import guarded
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI
+except Exception:  # pragma: no cover
+    AsyncOpenAI = None  # type: ignore
+
+# Optional Hyperscan prefilter for the metric patterns
+try:
+    import hyperscan
 except Exception:  # pragma: no cover
-    OpenAI = None  # type: ignore
+    hyperscan = None  # type: ignore
+
+logger = logging.getLogger(__name__)
 
 APP_DIR = Path(__file__).resolve().parent
 ROOT_DIR = APP_DIR.parent
 DATA_DIR = ROOT_DIR / "data"
 DOCS_DIR = DATA_DIR / "regulatory_docs"
 
+# One client per process so the connection pool and TLS sessions to the API are reused
+_OAI_CLIENT = (
+    AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        http_client=httpx.AsyncClient(limits=httpx.Limits(max_keepalive_connections=20)),
+    )
+    if (AsyncOpenAI and settings.OPENAI_API_KEY)
+    else None
+)
+
+# Patterns used by the rule-based extraction path, compiled once at import
+_WS_RE = re.compile(r"\s+")
+_MAT_RE = re.compile(r"([A-Za-z ]+?)\s*(\d{1,3})\s*%")
+_RECYCLED_RE = re.compile(r"(recycled|post-consumer).{0,10}?(\d{1,3})\s*%", re.I)
+_CO2_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:kg\s*CO2e?|CO2)", re.I)
+_NUM_RE = re.compile(r"\d+(?:\.\d+)?")
+
+# Hyperscan finds where the leftmost match of each metric pattern starts in one
+# pass over the text; `re` then only runs a single anchored match there to pull
+# out the groups. Hyperscan's \s is narrower than Python's for str patterns, so
+# the ASCII whitespace class is spelled out; non-ASCII text always uses `re`.
+_HS_RECYCLED, _HS_CO2 = 1, 2
+_HS_WS = rb"[\t\n\v\f\r\x1c-\x1f ]"
+_HS_LOCK = threading.Lock()
+_HS_DB = None
+if hyperscan is not None:
+    try:
+        _HS_DB = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        _HS_DB.compile(
+            expressions=[
+                rb"(?:recycled|post-consumer).{0,10}[0-9]{1,3}" + _HS_WS + rb"*%",
+                rb"[0-9]+(?:\.[0-9]+)?" + _HS_WS + rb"*(?:kg" + _HS_WS + rb"*CO2e?|CO2)",
+            ],
+            ids=[_HS_RECYCLED, _HS_CO2],
+            elements=2,
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST] * 2,
+        )
+    except Exception:  # pragma: no cover
+        logger.warning("Hyperscan database failed to compile; using re only", exc_info=True)
+        _HS_DB = None
+
+def _metric_starts(text: str) -> Optional[Dict[int, int]]:
+    """Leftmost match start per metric pattern id, or None when Hyperscan can't be used."""
+    if _HS_DB is None or not text.isascii():
+        return None
+    starts: Dict[int, int] = {}
+
+    def on_match(pid: int, start: int, end: int, flags: int, context: Any) -> None:
+        if start < starts.get(pid, end):
+            starts[pid] = start
+
+    # A Database owns a single scratch space, so scans are serialized
+    with _HS_LOCK:
+        _HS_DB.scan(text.encode("ascii"), match_event_handler=on_match)
+    return starts
+
+def _metric_search(pattern: "re.Pattern[str]", pid: int, text: str, starts: Optional[Dict[int, int]]):
+    if starts is None:
+        return pattern.search(text)
+    pos = starts.get(pid)
+    return None if pos is None else pattern.match(text, pos)
+
 def _load_regulatory_snippets() -> List[Tuple[str, str]]:
     snippets = []
     if DOCS_DIR.exists():
@@ -35,33 +114,71 @@ def _load_regulatory_snippets() -> List[Tuple[str, str]]:
 
 RAG_STORE = _load_regulatory_snippets()
 
+# Keywords linking supplier text to regulatory snippets. Snippets are case-folded
+# and keyword-indexed once here, so lookups only scan and intersect the input text.
+KEYWORDS = ("material", "recycled", "co2", "repair", "recycling")
+_KW_BYTES = [(k.encode("ascii"), k) for k in KEYWORDS]
+RAG_STORE_LC = [(aid, snip.lower()) for aid, snip in RAG_STORE]
+RAG_INDEX = [(aid, frozenset(k for k in KEYWORDS if k in snip)) for aid, snip in RAG_STORE_LC]
+
+# Identical payloads are common in demo/replay traffic; skip the pipeline (and any
+# OpenAI round-trip) for content we have already processed.
+# Standardized DPPs are kept as msgpack bytes: compact, and every hit decodes a
+# fresh struct so callers can't mutate a cached entry.
+_DPP_CACHE = LRUCache(maxsize=10_000)
+_DPP_PACK = msgspec.msgpack.Encoder()
+_DPP_UNPACK = msgspec.msgpack.Decoder(DigitalProductPassport)
+_INSIGHTS_CACHE = LRUCache(maxsize=1024)
+_QA_CACHE = LRUCache(maxsize=1024)
+
+def cache_stats() -> Dict[str, Any]:
+    return {
+        "dpp": _DPP_CACHE.stats(),
+        "insights": _INSIGHTS_CACHE.stats(),
+        "qa": _QA_CACHE.stats(),
+        "semantic": semantic_cache.stats(),
+    }
+
+def _json_key(obj: Any, extra: str = "") -> str:
+    return content_key(orjson.dumps(obj, option=orjson.OPT_SORT_KEYS) + extra.encode("utf-8"))
+
 def _mock_llm_summarize(text: str) -> str:
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _WS_RE.sub(" ", text).strip()
     return (text[:220] + "...") if len(text) > 220 else text
 
-def _extract_materials(unstructured: str) -> List[Material]:
+MAX_MATERIALS = 10
+
+# Fallback when no "<name> <pct>%" pairs are found: (display name, lowercase needle)
+_FALLBACK_MATERIALS = tuple(
+    (kw, kw.lower())
+    for kw in ("Cotton", "Polyester", "Nylon", "Wool", "Steel", "Aluminium", "Glass", "ABS", "Copper")
+)
+
+def _extract_materials(unstructured: str) -> List[Dict[str, Any]]:
+    # Plain dicts; they become Material structs once the DPP is built
     mats = []
-    for name, pct in re.findall(r"([A-Za-z ]+?)\s*(\d{1,3})\s*%", unstructured):
-        name = name.strip().lower().title()
+    for match in _MAT_RE.finditer(unstructured):
+        name, pct = match.groups()
         try:
             value = float(pct)
-            if 0 <= value <= 100:
-                mats.append(Material(name=name, percentage=value))
         except ValueError:
             continue
+        if 0 <= value <= 100:
+            mats.append({"name": name.strip().lower().title(), "percentage": value})
+            if len(mats) >= MAX_MATERIALS:
+                break
     if not mats:
-        keywords = ["Cotton", "Polyester", "Nylon", "Wool", "Steel", "Aluminium", "Glass", "ABS", "Copper"]
-        for kw in keywords:
-            if kw.lower() in unstructured.lower():
-                mats.append(Material(name=kw, percentage=0.0))
-    total = sum(m.percentage for m in mats)
+        lowered = unstructured.lower()
+        mats = [{"name": kw, "percentage": 0.0} for kw, needle in _FALLBACK_MATERIALS if needle in lowered]
+        del mats[MAX_MATERIALS:]
+    total = sum(m["percentage"] for m in mats)
     if total > 0 and 80 <= total <= 120:
         for m in mats:
-            m.percentage = round(m.percentage / total * 100.0, 2)
-    return mats[:10]
+            m["percentage"] = round(m["percentage"] / total * 100.0, 2)
+    return mats
 
-def _parse_recycled_content(text: str) -> float:
-    m = re.search(r"(recycled|post-consumer).{0,10}?(\d{1,3})\s*%", text, re.I)
+def _parse_recycled_content(text: str, starts: Optional[Dict[int, int]] = None) -> float:
+    m = _metric_search(_RECYCLED_RE, _HS_RECYCLED, text, starts)
     if m:
         try:
             val = float(m.group(2))
@@ -70,62 +187,183 @@ def _parse_recycled_content(text: str) -> float:
             pass
     return 0.0
 
-def _parse_co2(text: str) -> float:
-    m = re.search(r"(\d+(?:\.\d+)?)\s*(?:kg\s*CO2e?|CO2)", text, re.I)
+def _parse_co2(text: str, starts: Optional[Dict[int, int]] = None) -> float:
+    # Only a number tied to a CO2 unit counts; any other figure in the text
+    # (typically a material percentage) is not a footprint
+    m = _metric_search(_CO2_RE, _HS_CO2, text, starts)
     if m:
         try:
             return float(m.group(1))
         except Exception:
             pass
-    m2 = re.search(r"\b(\d+(?:\.\d+)?)\b", text)
-    if m2:
-        try:
-            return float(m2.group(1))
-        except Exception:
-            pass
     return 0.0
 
 def _find_references(text: str) -> List[str]:
-    refs = []
-    for art_id, snippet in RAG_STORE:
-        if any(kw.lower() in text.lower() for kw in ["material", "recycled", "co2", "repair", "recycling"]):
-            if "material" in text.lower() and "material" in snippet.lower(): refs.append(art_id)
-            if "recycled" in text.lower() and "recycled" in snippet.lower(): refs.append(art_id)
-            if "co2" in text.lower() and "co2" in snippet.lower(): refs.append(art_id)
-            if "repair" in text.lower() and "repair" in snippet.lower(): refs.append(art_id)
-            if "recycling" in text.lower() and "recycling" in snippet.lower(): refs.append(art_id)
-    return sorted(list(set(refs)))[:5]
-
-def _openai_assisted_standardize(raw: Dict[str, Any]) -> Dict[str, Any]:
-    if OpenAI is None or not settings.OPENAI_API_KEY:
+    # Keywords are ASCII, so scan bytes; "replace" keeps non-ASCII chars as
+    # separators instead of splicing their neighbours together
+    tl = text.lower().encode("ascii", "replace")
+    present = {tag for kw, tag in _KW_BYTES if tl.find(kw) != -1}
+    refs = {aid for aid, kws in RAG_INDEX if kws & present}
+    return sorted(refs)[:5]
+
+# ---------- OpenAI request coalescer ----------
+# Concurrent handlers enqueue prompts; a single worker drains up to
+# LLM_BATCH_MAX of them within LLM_BATCH_WINDOW_S and dispatches the group
+# concurrently, resolving each caller's future as its own completion lands.
+
+LLM_BATCH_MAX = 16
+LLM_BATCH_WINDOW_S = 0.03
+
+_llm_queue: Optional[asyncio.Queue] = None
+_llm_worker_task: Optional[asyncio.Task] = None
+_llm_inflight: set = set()
+
+# Compact target schema for standardization; JSON mode enforces well-formed output
+_DPP_SCHEMA = (
+    '{"product_id":str,"product_name":str,"manufacturer":str,'
+    '"materials_composition":[{"name":str,"percentage":0-100}],'
+    '"recycled_content_percentage":number,"co2_footprint_kg":number,"repair_score":str,'
+    '"recycling_instructions":str,"supply_chain_partners":[str],"compliance_status":str,'
+    '"espr_article_references":[str]}'
+)
+_JSON_MODE = {"response_format": {"type": "json_object"}}
+
+async def _create_completion(prompt: str, options: Dict[str, Any]) -> str:
+    resp = await _OAI_CLIENT.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.2,
+        **options,
+    )
+    return resp.choices[0].message.content  # type: ignore
+
+async def _resolve(prompt: str, options: Dict[str, Any], fut: asyncio.Future) -> None:
+    try:
+        result = await _create_completion(prompt, options)
+    except Exception as e:
+        if not fut.done():
+            fut.set_exception(e)
+    else:
+        if not fut.done():
+            fut.set_result(result)
+
+async def _llm_worker() -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await _llm_queue.get()]
+        deadline = loop.time() + LLM_BATCH_WINDOW_S
+        while len(batch) < LLM_BATCH_MAX:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_llm_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Dispatch without awaiting so the next batch can start filling immediately
+        task = asyncio.ensure_future(asyncio.gather(*(_resolve(*item) for item in batch)))
+        _llm_inflight.add(task)
+        task.add_done_callback(_llm_inflight.discard)
+
+def start_llm_worker() -> None:
+    global _llm_queue, _llm_worker_task
+    if _llm_worker_task is None or _llm_worker_task.done():
+        _llm_queue = asyncio.Queue()
+        _llm_worker_task = asyncio.create_task(_llm_worker())
+
+async def stop_llm_worker() -> None:
+    global _llm_worker_task
+    if _llm_worker_task is not None:
+        _llm_worker_task.cancel()
+        try:
+            await _llm_worker_task
+        except asyncio.CancelledError:
+            pass
+        _llm_worker_task = None
+    if _llm_inflight:
+        await asyncio.gather(*_llm_inflight, return_exceptions=True)
+
+def _semantic_scope(prompt: str, scope: str) -> str:
+    # Prompts that differ only in their numbers (a corrected percentage or CO2
+    # value) are near-duplicates textually but need a fresh answer, so every
+    # number in the prompt is part of the scope.
+    return f"{scope}#{content_key(' '.join(_NUM_RE.findall(prompt)).encode('utf-8'))}"
+
+async def _chat_completion(prompt: str, scope: str, **options: Any) -> str:
+    """Completion for `prompt`, served from the semantic cache when a near-duplicate was seen."""
+    scope = _semantic_scope(prompt, scope)
+    content = semantic_cache.lookup(prompt, scope)
+    if content is None:
+        if _llm_worker_task is None or _llm_worker_task.done():
+            # Worker not started (e.g. called outside the app); go direct
+            content = await _create_completion(prompt, options)
+        else:
+            fut = asyncio.get_running_loop().create_future()
+            await _llm_queue.put((prompt, options, fut))
+            content = await fut
+        semantic_cache.store(prompt, content, scope)
+    return content
+
+async def _openai_assisted_standardize(raw: Dict[str, Any]) -> Dict[str, Any]:
+    if _OAI_CLIENT is None:
         return {}
     try:
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        prompt = f"""You are standardizing a Digital Product Passport from messy supplier data.
-Return a strict JSON object with keys: product_id, product_name, manufacturer, materials_composition (list of {{name, percentage}}),
-recycled_content_percentage, co2_footprint_kg, repair_score, recycling_instructions, supply_chain_partners (list of strings),
-compliance_status, espr_article_references (list of strings).
-
-Messy data:
-{json.dumps(raw)}
-
-If a value is missing, infer conservatively and explain minimal assumptions in a hidden field 'notes'."""
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
+        prompt = (
+            "Standardize this DPP into the schema. Output JSON only.\n"
+            f"Schema: {_DPP_SCHEMA}\n"
+            f"Data: {orjson.dumps(raw).decode()}"
         )
-        content = resp.choices[0].message.content  # type: ignore
-        match = re.search(r"{.*}", content, re.S)
-        if match:
-            data = json.loads(match.group(0))
-            data.pop("notes", None)
+        # Only reuse completions for the same product identity
+        scope = "standardize:" + "|".join(str(raw.get(k, "")) for k in ("product_id", "product_name", "manufacturer"))
+        data = orjson.loads(await _chat_completion(prompt, scope, **_JSON_MODE))
+        if isinstance(data, dict):
             return data
     except Exception:
         pass
     return {}
 
-def standardize_product_data(raw: Dict[str, Any]) -> DigitalProductPassport:
+def _as_str_list(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value]
+    return [str(value)]
+
+def _rule_based_dpp(raw: Dict[str, Any], unstructured: str) -> DigitalProductPassport:
+    materials = _extract_materials(unstructured)
+    starts = _metric_starts(unstructured)
+    recycled_pct = _parse_recycled_content(unstructured, starts)
+    co2 = _parse_co2(unstructured, starts)
+    refs = _find_references(unstructured if unstructured else "material recycled co2 repair recycling")
+
+    # Raw values are coerced here so the result satisfies the model without a validation pass
+    product_id = raw.get("product_id") or str(uuid.uuid4())
+    product_name = raw.get("product_name") or raw.get("name") or "Unknown Product"
+    manufacturer = raw.get("manufacturer") or raw.get("brand") or "Unknown Manufacturer"
+    repair_score = raw.get("repair_score") or "N/A"
+    recycling_instructions = raw.get("recycling_instructions") or "Check local guidelines; disassemble by material where possible."
+    supply_chain = raw.get("supply_chain_partners") or raw.get("suppliers") or []
+
+    return load_trusted_dpp({
+        "product_id": str(product_id),
+        "product_name": str(product_name),
+        "manufacturer": str(manufacturer),
+        "materials_composition": materials,
+        "recycled_content_percentage": recycled_pct,
+        "co2_footprint_kg": co2,
+        "repair_score": str(repair_score),
+        "recycling_instructions": str(recycling_instructions),
+        "supply_chain_partners": _as_str_list(supply_chain),
+        "compliance_status": "unknown",
+        "espr_article_references": refs or ["ESPR_Article_1", "ESPR_Article_2"],
+    })
+
+async def standardize_product_data(raw: Dict[str, Any]) -> DigitalProductPassport:
+    key = _json_key(raw)
+    cached = _DPP_CACHE.get(key)
+    if cached is not None:
+        return _DPP_UNPACK.decode(cached)
+
     unstructured_parts = []
     for k in ("description", "notes", "bom_text", "specs", "details"):
         val = raw.get(k)
@@ -135,92 +373,104 @@ def standardize_product_data(raw: Dict[str, Any]) -> DigitalProductPassport:
 
     data = {}
     if settings.AI_BACKEND == "openai":
-        data = _openai_assisted_standardize(raw)
-
-    if not data:
-        materials = _extract_materials(unstructured)
-        recycled_pct = _parse_recycled_content(unstructured)
-        co2 = _parse_co2(unstructured)
-        refs = _find_references(unstructured if unstructured else "material recycled co2 repair recycling")
-
-        product_id = raw.get("product_id") or str(uuid.uuid4())
-        product_name = raw.get("product_name") or raw.get("name") or "Unknown Product"
-        manufacturer = raw.get("manufacturer") or raw.get("brand") or "Unknown Manufacturer"
-        repair_score = raw.get("repair_score") or "N/A"
-        recycling_instructions = raw.get("recycling_instructions") or "Check local guidelines; disassemble by material where possible."
-        supply_chain = raw.get("supply_chain_partners") or raw.get("suppliers") or []
-
-        data = {
-            "product_id": product_id,
-            "product_name": product_name,
-            "manufacturer": manufacturer,
-            "materials_composition": [m.model_dump() for m in materials],
-            "recycled_content_percentage": recycled_pct,
-            "co2_footprint_kg": co2,
-            "repair_score": str(repair_score),
-            "recycling_instructions": recycling_instructions,
-            "supply_chain_partners": supply_chain,
-            "compliance_status": "unknown",
-            "espr_article_references": refs or ["ESPR_Article_1", "ESPR_Article_2"],
-        }
-
-    return DigitalProductPassport(**data)
+        data = await _openai_assisted_standardize(raw)
+
+    dpp = None
+    if data:
+        # LLM output is untrusted and gets full validation; lax mode accepts
+        # numbers sent as strings ("2.4"), and anything else invalid falls
+        # back to the rule-based result
+        try:
+            dpp = msgspec.convert(data, DigitalProductPassport, strict=False)
+        except msgspec.ValidationError:
+            logger.warning("Discarding invalid LLM standardization output", exc_info=True)
+    if dpp is None:
+        dpp = _rule_based_dpp(raw, unstructured)
+
+    _DPP_CACHE.put(key, _DPP_PACK.encode(dpp))
+    return dpp
+
+def warm_up() -> None:
+    """
+    Exercise the rule-based pipeline once so the first request doesn't pay for
+    validator/regex warm-up. Never calls OpenAI and never touches the caches.
+    """
+    start = time.perf_counter()
+    sample = "Cotton 60%, Polyester 40%. Recycled content 25%. CO2 2.4 kg CO2e. Repair and recycling."
+    mats = _extract_materials(sample)
+    dpp = msgspec.to_builtins(msgspec.convert({
+        "product_id": "warmup",
+        "product_name": "Warm-up",
+        "manufacturer": "Warm-up",
+        "materials_composition": mats,
+        "recycled_content_percentage": _parse_recycled_content(sample),
+        "co2_footprint_kg": _parse_co2(sample),
+        "espr_article_references": _find_references(sample),
+    }, DigitalProductPassport))
+    _compose_summary_rules(dpp)
+    logger.info("AI processor warmed up in %.1f ms", (time.perf_counter() - start) * 1000)
 
 # ---------- New helpers: Insights + QA ----------
 
+_HINT_RECYCLED = "- Recycled content below typical targets (≥20–30%). Consider supplier update."
+_HINT_CO2 = "- CO₂ footprint not reported; add methodology and kg CO₂e."
+_HINT_REPAIR = "- Repair score missing; include iFixit-style or internal metric."
+_HINT_RECYCLING = "- Add clear end-of-life recycling guidance."
+_HINT_NONE = "- No immediate issues detected."
+
 def _compose_summary_rules(dpp: Dict[str, Any]) -> str:
-    mats = dpp.get("materials_composition") or []
-    top_mats = ", ".join(f"{m.get('name','?')} {m.get('percentage',0)}%" for m in mats[:4]) or "not specified"
-    recycled = dpp.get("recycled_content_percentage", 0.0)
-    co2 = dpp.get("co2_footprint_kg", 0.0)
-    repair = dpp.get("repair_score", "N/A")
-    status = dpp.get("compliance_status", "unknown")
-
-    hints = []
+    get = dpp.get
+    mats = get("materials_composition") or []
+    recycled = get("recycled_content_percentage", 0.0)
+    co2 = get("co2_footprint_kg", 0.0)
+    repair = get("repair_score", "N/A")
+
+    hints: List[str] = []
     if recycled < 20:
-        hints.append("Recycled content below typical targets (≥20–30%). Consider supplier update.")
+        hints.append(_HINT_RECYCLED)
     if co2 == 0:
-        hints.append("CO₂ footprint not reported; add methodology and kg CO₂e.")
+        hints.append(_HINT_CO2)
     if repair in ("N/A", "", None):
-        hints.append("Repair score missing; include iFixit-style or internal metric.")
-    if not dpp.get("recycling_instructions"):
-        hints.append("Add clear end-of-life recycling guidance.")
-
-    bullets = "\n".join([f"- {h}" for h in hints]) or "- No immediate issues detected."
-    return (
-        f"Product: {dpp.get('product_name','Unknown')} (Manufacturer: {dpp.get('manufacturer','Unknown')})\n"
-        f"Materials: {top_mats}\n"
-        f"Recycled content: {recycled:.1f}%\n"
-        f"CO₂ footprint: {co2:.2f} kg CO₂e\n"
-        f"Repair score: {repair}\n"
-        f"Compliance status: {status}\n\n"
-        f"Recommendations:\n{bullets}"
-    )
+        hints.append(_HINT_REPAIR)
+    if not get("recycling_instructions"):
+        hints.append(_HINT_RECYCLING)
+
+    top_mats = ", ".join([f"{m.get('name','?')} {m.get('percentage',0)}%" for m in mats[:4]]) or "not specified"
+    return "\n".join([
+        f"Product: {get('product_name','Unknown')} (Manufacturer: {get('manufacturer','Unknown')})",
+        f"Materials: {top_mats}",
+        f"Recycled content: {recycled:.1f}%",
+        f"CO₂ footprint: {co2:.2f} kg CO₂e",
+        f"Repair score: {repair}",
+        f"Compliance status: {get('compliance_status', 'unknown')}",
+        "",
+        "Recommendations:",
+        "\n".join(hints) or _HINT_NONE,
+    ])
 
-def summarize_insights(dpp: Dict[str, Any]) -> Dict[str, Any]:
+async def summarize_insights(dpp: Dict[str, Any]) -> Dict[str, Any]:
     """
     Returns a dict with short 'summary' text and a risk/compliance 'score' 0..100.
     Uses OpenAI if configured else rule-based.
     """
-    if settings.AI_BACKEND == "openai" and OpenAI and settings.OPENAI_API_KEY:
+    key = _json_key(dpp)
+    cached = _INSIGHTS_CACHE.get(key)
+    if cached is not None:
+        return dict(cached)
+
+    if settings.AI_BACKEND == "openai" and _OAI_CLIENT is not None:
         try:
-            client = OpenAI(api_key=settings.OPENAI_API_KEY)
             prompt = (
-                "Generate a concise compliance-oriented summary and a 0..100 score for this Digital Product Passport.\n"
-                "Return JSON with keys: summary (string, 4-6 sentences), score (number 0..100).\n\n"
-                f"DPP JSON:\n{json.dumps(dpp)}"
+                'Compliance summary (4-6 sentences) and 0..100 score for this DPP. Output JSON {"summary","score"}.\n'
+                f"DPP: {orjson.dumps(dpp).decode()}"
             )
-            resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2,
+            content = await _chat_completion(
+                prompt, f"insights:{dpp.get('product_id', '')}", max_tokens=300, **_JSON_MODE
             )
-            content = resp.choices[0].message.content  # type: ignore
-            match = re.search(r"{.*}", content, re.S)
-            if match:
-                out = json.loads(match.group(0))
-                if "summary" in out and "score" in out:
-                    return out
+            out = orjson.loads(content)
+            if isinstance(out, dict) and "summary" in out and "score" in out:
+                _INSIGHTS_CACHE.put(key, out)
+                return dict(out)
         except Exception:
             pass
 
@@ -231,41 +481,49 @@ def summarize_insights(dpp: Dict[str, Any]) -> Dict[str, Any]:
     if dpp.get("recycled_content_percentage", 0.0) < 20: score -= 10
     if dpp.get("co2_footprint_kg", 0.0) == 0: score -= 10
     if not dpp.get("recycling_instructions"): score -= 10
-    return {"summary": text, "score": max(0, min(100, score))}
+    out = {"summary": text, "score": max(0, min(100, score))}
+    _INSIGHTS_CACHE.put(key, out)
+    return dict(out)
 
-def qa_on_dpp(dpp: Dict[str, Any], question: str) -> str:
+async def qa_on_dpp(dpp: Dict[str, Any], question: str) -> str:
     """
     Answers a user question about the current product DPP.
     Uses OpenAI if configured else rule-based template.
     """
-    if settings.AI_BACKEND == "openai" and OpenAI and settings.OPENAI_API_KEY:
+    key = _json_key(dpp, question)
+    cached = _QA_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    answer = await _answer_question(dpp, question)
+    _QA_CACHE.put(key, answer)
+    return answer
+
+async def _answer_question(dpp: Dict[str, Any], question: str) -> str:
+    if settings.AI_BACKEND == "openai" and _OAI_CLIENT is not None:
         try:
-            client = OpenAI(api_key=settings.OPENAI_API_KEY)
             prompt = (
-                "Answer the question using ONLY the provided DPP JSON context. "
-                "If unknown, say so briefly. Keep answer under 6 sentences.\n\n"
-                f"DPP:\n{json.dumps(dpp)}\n\n"
+                "Answer from this DPP only; if unknown, say so. Under 6 sentences.\n"
+                f"DPP: {orjson.dumps(dpp).decode()}\n"
                 f"Question: {question}"
             )
-            resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2,
-            )
-            return resp.choices[0].message.content.strip()  # type: ignore
+            # A different question on the same DPP is textually close; never share answers across questions
+            scope = f"qa:{dpp.get('product_id', '')}:{' '.join(question.lower().split())}"
+            return (await _chat_completion(prompt, scope, max_tokens=300)).strip()
         except Exception:
             pass
 
     # Rule-based fallback
-    mats = ", ".join(f"{m.get('name')} {m.get('percentage',0)}%" for m in dpp.get("materials_composition", [])) or "not specified"
-    recycled = dpp.get("recycled_content_percentage", 0.0)
-    co2 = dpp.get("co2_footprint_kg", 0.0)
-    if "recycle" in question.lower():
-        return f"Recycling guidance: {dpp.get('recycling_instructions','not provided')}. Materials: {mats}."
-    if "co2" in question.lower() or "footprint" in question.lower():
-        return f"Reported CO₂ footprint: {co2} kg CO₂e."
-    if "materials" in question.lower() or "composition" in question.lower():
-        return f"Materials composition: {mats}."
-    if "recycled" in question.lower():
-        return f"Recycled content: {recycled:.1f}%."
+    q = question.lower()
+    if "recycle" in q:
+        return f"Recycling guidance: {dpp.get('recycling_instructions','not provided')}. Materials: {_materials_text(dpp)}."
+    if "co2" in q or "footprint" in q:
+        return f"Reported CO₂ footprint: {dpp.get('co2_footprint_kg', 0.0)} kg CO₂e."
+    if "materials" in q or "composition" in q:
+        return f"Materials composition: {_materials_text(dpp)}."
+    if "recycled" in q:
+        return f"Recycled content: {dpp.get('recycled_content_percentage', 0.0):.1f}%."
     return "Based on the DPP, the requested detail isn't explicitly reported. Consider updating supplier data."
+
+def _materials_text(dpp: Dict[str, Any]) -> str:
+    return ", ".join(f"{m.get('name')} {m.get('percentage',0)}%" for m in dpp.get("materials_composition", [])) or "not specified"
@@ -1,19 +1,36 @@
-import json
+import asyncio
 import os
+import threading
 import uuid
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
-from fastapi import FastAPI, Request, UploadFile, File, Body, HTTPException
+import httpx
+import msgspec
+import orjson
+from fastapi import FastAPI, Request, UploadFile, File, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+from . import semantic_cache, storage
 from .config import settings
-from .ai_processor import standardize_product_data, summarize_insights, qa_on_dpp
+from .ai_processor import (
+    standardize_product_data,
+    summarize_insights,
+    qa_on_dpp,
+    cache_stats,
+    warm_up,
+    start_llm_worker,
+    stop_llm_worker,
+)
 from .models import DigitalProductPassport
-from .services.data_validator import check_espr_compliance
+from .services import compliance_cache
+from .services import supply_chain_api
+from .services.dpp_table import DPPTable
+from .services.supply_chain_api import create_http_client, get_suppliers, get_traceability_record
 
 APP_DIR = Path(__file__).resolve().parent
 ROOT_DIR = APP_DIR.parent
@@ -21,7 +38,7 @@ DATA_DIR = ROOT_DIR / "data"
 RAW_DIR = DATA_DIR / "raw_supplier_data"
 PROCESSED_DIR = DATA_DIR / "processed_dpp"
 
-app = FastAPI(title="DPP-Comply MVP", version="0.1.0")
+app = FastAPI(title="DPP-Comply MVP", version="0.1.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -41,6 +58,133 @@ templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 # Ensure data directories
 for d in (DATA_DIR, RAW_DIR, PROCESSED_DIR):
     d.mkdir(parents=True, exist_ok=True)
+if not (PROCESSED_DIR / storage.META_NAME).exists():
+    storage.write_meta(PROCESSED_DIR)
+
+
+_ENC = msgspec.json.Encoder()
+_OBJ_DEC = msgspec.json.Decoder(Dict[str, Any])
+
+
+async def _json_body(request: Request) -> Dict[str, Any]:
+    """Decode a JSON object body in one pass, bypassing FastAPI's Body() validation."""
+    try:
+        return _OBJ_DEC.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+
+
+# Disk I/O runs in the thread pool so the event loop keeps serving other requests
+def _read_json(fp: Path) -> Dict[str, Any]:
+    with fp.open("rb") as f:
+        return orjson.loads(f.read())
+
+
+def _write_json(fp: Path, data: Any) -> None:
+    with fp.open("wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+
+def _write_bytes(fp: Path, data: bytes) -> None:
+    with fp.open("wb") as f:
+        f.write(data)
+
+
+async def _load_dpp(product_id: str) -> Optional[DigitalProductPassport]:
+    return await run_in_threadpool(storage.read_dpp, PROCESSED_DIR, product_id)
+
+
+# ---------- Product index ----------
+# list_products serves from memory; the index file is rewritten shortly after
+# changes and reconciled with the DPP files on disk at startup.
+
+INDEX_PATH = PROCESSED_DIR / "_index.json"
+INDEX_FLUSH_DELAY_S = 0.5
+
+_INDEX: Dict[str, Dict[str, Any]] = {}
+_INDEX_LOCK = threading.Lock()
+_index_flush: Optional[asyncio.Task] = None
+
+
+def _index_entry(dpp: Dict[str, Any]) -> Dict[str, Any]:
+    return {"product_id": dpp.get("product_id"), "product_name": dpp.get("product_name")}
+
+
+def _load_index() -> None:
+    try:
+        indexed = _read_json(INDEX_PATH)
+    except Exception:
+        indexed = {}
+    # Entries whose DPP file is gone are dropped; files the index lacks are read once
+    entries = {}
+    for product_id in storage.iter_product_ids(PROCESSED_DIR):
+        if product_id in indexed:
+            entries[product_id] = indexed[product_id]
+            continue
+        dpp = storage.read_dpp(PROCESSED_DIR, product_id)
+        if dpp is None:
+            continue
+        entries[product_id] = {"product_id": dpp.product_id, "product_name": dpp.product_name}
+    with _INDEX_LOCK:
+        _INDEX.update(entries)
+
+
+def _write_index() -> None:
+    with _INDEX_LOCK:
+        snapshot = dict(_INDEX)
+    tmp = INDEX_PATH.with_suffix(".tmp")
+    _write_json(tmp, snapshot)
+    os.replace(tmp, INDEX_PATH)
+
+
+async def _flush_index_later() -> None:
+    await asyncio.sleep(INDEX_FLUSH_DELAY_S)
+    await run_in_threadpool(_write_index)
+
+
+def _update_index(dpp: Dict[str, Any]) -> None:
+    global _index_flush
+    with _INDEX_LOCK:
+        _INDEX[dpp["product_id"]] = _index_entry(dpp)
+    if _index_flush is None or _index_flush.done():
+        _index_flush = asyncio.create_task(_flush_index_later())
+
+
+# ---------- Columnar scan table ----------
+# Filled from disk on the first scan, then kept current by _ingest.
+
+_TABLE = DPPTable()
+_TABLE_LOADED = threading.Event()
+_TABLE_LOAD_LOCK = threading.Lock()
+
+
+def _load_table() -> None:
+    with _TABLE_LOAD_LOCK:
+        if _TABLE_LOADED.is_set():
+            return
+        for product_id in storage.iter_product_ids(PROCESSED_DIR):
+            if product_id in _TABLE:
+                continue
+            dpp = storage.read_dpp(PROCESSED_DIR, product_id)
+            if dpp is not None:
+                _TABLE.upsert(dpp)
+        _TABLE_LOADED.set()
+
+
+@app.on_event("startup")
+async def _startup():
+    await run_in_threadpool(_load_index)
+    warm_up()
+    start_llm_worker()
+    app.state.http = create_http_client()
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await stop_llm_worker()
+    await app.state.http.aclose()
+    await run_in_threadpool(_write_index)
+    semantic_cache.save()
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -53,109 +197,232 @@ def dpp_viewer(request: Request, product_id: str):
     return templates.TemplateResponse("dpp_viewer.html", {"request": request, "product_id": product_id})
 
 
-@app.post("/api/process-product")
-async def process_product(raw: Dict[str, Any] = Body(...)):
-    """
-    Ingest raw supplier data (possibly messy/unstructured) and produce a standardized DPP.
-    Saves raw input and processed DPP to local filesystem for demo purposes.
-    """
+async def _ingest(raw: Dict[str, Any]) -> Tuple[str, bytes]:
+    """Standardize one raw payload, persist raw + processed copies, and return the encoded DPP."""
     product_id = raw.get("product_id") or str(uuid.uuid4())
+    if storage.is_reserved_id(str(product_id)):
+        raise HTTPException(status_code=400, detail=f"Invalid product_id: {product_id!r}")
     raw_path = RAW_DIR / f"{product_id}.json"
-    with raw_path.open("w", encoding="utf-8") as f:
-        json.dump(raw, f, indent=2, ensure_ascii=False)
+    await run_in_threadpool(_write_json, raw_path, raw)
 
     # Process via AI/Rule-based pipeline
     try:
-        dpp: DigitalProductPassport = standardize_product_data(raw)
+        dpp: DigitalProductPassport = await standardize_product_data(raw)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Processing error: {e}")
 
-    processed_path = PROCESSED_DIR / f"{dpp.product_id}.json"
-    with processed_path.open("w", encoding="utf-8") as f:
-        json.dump(dpp.model_dump(), f, indent=2, ensure_ascii=False)
+    # Encode once for responses (embedded as-is); the file gets the msgpack form
+    body = _ENC.encode(dpp)
+    processed_path = storage.dpp_path(PROCESSED_DIR, dpp.product_id)
+    await run_in_threadpool(_write_bytes, processed_path, storage.encode_dpp(dpp))
+    _update_index({"product_id": dpp.product_id, "product_name": dpp.product_name})
+    _TABLE.upsert(dpp)
+    # Write-through: the report endpoint serves these bytes until the next re-ingest
+    compliance_cache.refresh(dpp)
+    supply_chain_api.invalidate(dpp.product_id)
+    return dpp.product_id, body
+
 
-    return {"message": "processed", "product_id": dpp.product_id, "dpp": dpp.model_dump()}
+@app.post("/api/process-product")
+async def process_product(request: Request):
+    """
+    Ingest raw supplier data (possibly messy/unstructured) and produce a standardized DPP.
+    Saves raw input and processed DPP to local filesystem for demo purposes.
+    """
+    product_id, body = await _ingest(await _json_body(request))
+    return Response(
+        content=_ENC.encode({"message": "processed", "product_id": product_id, "dpp": msgspec.Raw(body)}),
+        media_type="application/json",
+    )
+
+
+MAX_BATCH_SIZE = 64
+# Products standardized at a time by default; matches the LLM coalescer's batch
+DEFAULT_BATCH_CONCURRENCY = 16
+_BATCH_DEC = msgspec.json.Decoder(List[Dict[str, Any]])
+
+
+@app.post("/api/process-products:batch")
+async def process_products_batch(
+    request: Request, batch_size: int = Query(DEFAULT_BATCH_CONCURRENCY, ge=1, le=MAX_BATCH_SIZE)
+):
+    """
+    Ingest a JSON array of up to MAX_BATCH_SIZE raw payloads in one request. The
+    array is decoded in a single pass and products are standardized at most
+    `batch_size` at a time; a failing item is reported in place without failing
+    the rest.
+    """
+    try:
+        raws = _BATCH_DEC.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch: {e}")
+    if len(raws) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_SIZE} products")
+
+    slots = asyncio.Semaphore(batch_size)
+
+    async def ingest_bounded(raw: Dict[str, Any]) -> Tuple[str, bytes]:
+        async with slots:
+            return await _ingest(raw)
+
+    outcomes = await asyncio.gather(*(ingest_bounded(raw) for raw in raws), return_exceptions=True)
+    results = []
+    for outcome in outcomes:
+        if isinstance(outcome, HTTPException):
+            results.append({"error": outcome.detail})
+        elif isinstance(outcome, Exception):
+            results.append({"error": str(outcome)})
+        else:
+            product_id, body = outcome
+            results.append({"product_id": product_id, "dpp": msgspec.Raw(body)})
+    return Response(
+        content=_ENC.encode({"message": "processed", "results": results}),
+        media_type="application/json",
+    )
 
 
 @app.get("/api/products/")
-def list_products():
-    items = []
-    for fp in PROCESSED_DIR.glob("*.json"):
-        try:
-            with fp.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-                items.append({"product_id": data.get("product_id"), "product_name": data.get("product_name")})
-        except Exception:
-            continue
+async def list_products():
+    with _INDEX_LOCK:
+        items = list(_INDEX.values())
     return {"products": items}
 
 
+def _compliance_for(dpp: DigitalProductPassport) -> bytes:
+    # Misses (evicted, or stored before this process started) are recomputed inline;
+    # the check is a few attribute lookups
+    body = compliance_cache.get(dpp.product_id)
+    return body if body is not None else compliance_cache.refresh(dpp)
+
+
 @app.get("/api/product/{product_id}/dpp")
-def get_dpp(product_id: str):
-    fp = PROCESSED_DIR / f"{product_id}.json"
-    if not fp.exists():
+async def get_dpp(request: Request, product_id: str, embed: bool = Query(False)):
+    """
+    Stored DPP as JSON. With ?embed=true the suppliers, traceability record and
+    compliance report come back in the same response, saving the client two
+    round-trips; the disk read and the supplier lookups run concurrently.
+    """
+    # The typed msgpack decoder yields the struct directly; it is re-encoded without
+    # going through dicts or FastAPI's encoder.
+    if not embed:
+        dpp = await _load_dpp(product_id)
+        if dpp is None:
+            raise HTTPException(status_code=404, detail="DPP not found")
+        return Response(content=_ENC.encode(dpp), media_type="application/json")
+
+    session = getattr(request.app.state, "http", None)
+    try:
+        dpp, suppliers, traceability = await asyncio.gather(
+            _load_dpp(product_id),
+            get_suppliers(product_id, session),
+            get_traceability_record(product_id, session),
+        )
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Supply chain API error: {e}")
+    if dpp is None:
         raise HTTPException(status_code=404, detail="DPP not found")
-    with fp.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data
+    return Response(
+        content=_ENC.encode({
+            "dpp": dpp,
+            "suppliers": suppliers,
+            "traceability": traceability,
+            "compliance": msgspec.Raw(_compliance_for(dpp)),
+        }),
+        media_type="application/json",
+    )
 
 
 @app.get("/api/product/{product_id}/compliance-report")
-def compliance_report(product_id: str):
-    fp = PROCESSED_DIR / f"{product_id}.json"
-    if not fp.exists():
-        raise HTTPException(status_code=404, detail="DPP not found")
-    with fp.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    report = check_espr_compliance(data)
-    return report
+async def compliance_report(product_id: str):
+    body = compliance_cache.get(product_id)
+    if body is None:
+        dpp = await _load_dpp(product_id)
+        if dpp is None:
+            raise HTTPException(status_code=404, detail="DPP not found")
+        body = _compliance_for(dpp)
+    return Response(content=body, media_type="application/json")
+
+@app.get("/api/compliance/scan")
+async def compliance_scan(status: Optional[str] = Query(None)):
+    """
+    ESPR status of every stored DPP, computed in one vectorized pass over the
+    columnar table. `status` filters the product list; counts always cover all.
+    """
+    if not _TABLE_LOADED.is_set():
+        await run_in_threadpool(_load_table)
+    result = _TABLE.scan()
+    products = [
+        {"product_id": pid, "status": st}
+        for pid, st in zip(result["product_ids"], result["statuses"])
+        if status is None or st == status
+    ]
+    return {"total": len(result["product_ids"]), "counts": result["counts"], "products": products}
+
+@app.get("/api/product/{product_id}/supply-chain")
+async def supply_chain(request: Request, product_id: str):
+    # The shared client exists once startup has run; without it the mocked data is used
+    session = getattr(request.app.state, "http", None)
+    try:
+        suppliers, traceability = await asyncio.gather(
+            get_suppliers(product_id, session),
+            get_traceability_record(product_id, session),
+        )
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Supply chain API error: {e}")
+    return {"product_id": product_id, "suppliers": suppliers, "traceability": traceability}
 
 @app.get("/api/config")
 def get_config():
     return {
         "ai_backend": settings.AI_BACKEND,
         "openai_configured": bool(settings.OPENAI_API_KEY),
+        "cache": {**cache_stats(), "compliance": compliance_cache.stats()},
     }
 
 @app.post("/api/insights")
-def get_insights(dpp: Dict[str, Any] = Body(...)):
+async def get_insights(request: Request):
     # Accepts a DPP JSON and returns summary + score
-    return summarize_insights(dpp)
+    return ORJSONResponse(await summarize_insights(await _json_body(request)))
 
 @app.post("/api/assistant")
-def assistant_qa(payload: Dict[str, Any] = Body(...)):
+async def assistant_qa(request: Request):
     """
     Payload: { "product_id": "<id>", "question": "..." }
     Loads the DPP from disk and answers the question.
     """
+    payload = await _json_body(request)
     pid = payload.get("product_id")
     question = payload.get("question") or ""
-    fp = PROCESSED_DIR / f"{pid}.json"
-    if not pid or not fp.exists():
+    dpp = await _load_dpp(pid) if pid else None
+    if dpp is None:
         raise HTTPException(status_code=404, detail="Product not found")
-    with fp.open("r", encoding="utf-8") as f:
-        dpp = json.load(f)
-    answer = qa_on_dpp(dpp, question)
-    return {"answer": answer}
+    answer = await qa_on_dpp(msgspec.to_builtins(dpp), question)
+    return ORJSONResponse({"answer": answer})
+
+CSV_HEADER = "product_id,product_name,manufacturer,metric,value"
+
+
+def _csv_field(value: Any) -> str:
+    text = str(value)
+    if any(c in text for c in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
 
 @app.get("/api/product/{product_id}/export.csv")
-def export_csv(product_id: str):
-    import io, csv
-    fp = PROCESSED_DIR / f"{product_id}.json"
-    if not fp.exists():
+async def export_csv(product_id: str):
+    dpp = await _load_dpp(product_id)
+    if dpp is None:
         raise HTTPException(status_code=404, detail="DPP not found")
-    with fp.open("r", encoding="utf-8") as f:
-        dpp = json.load(f)
     # flatten to simple rows: materials + key metrics
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["product_id","product_name","manufacturer","metric","value"])
-    writer.writerow([dpp["product_id"], dpp["product_name"], dpp["manufacturer"], "recycled_content_percentage", dpp.get("recycled_content_percentage",0)])
-    writer.writerow([dpp["product_id"], dpp["product_name"], dpp["manufacturer"], "co2_footprint_kg", dpp.get("co2_footprint_kg",0)])
-    writer.writerow([dpp["product_id"], dpp["product_name"], dpp["manufacturer"], "repair_score", dpp.get("repair_score","")])
-    for m in dpp.get("materials_composition", []):
-        writer.writerow([dpp["product_id"], dpp["product_name"], dpp["manufacturer"], f"material:{m.get('name','')}", m.get("percentage",0)])
-    return JSONResponse(
-        content={"csv": output.getvalue()},
-        media_type="application/json"
-    )
+    prefix = ",".join(_csv_field(v) for v in (dpp.product_id, dpp.product_name, dpp.manufacturer))
+    lines = [
+        CSV_HEADER,
+        f"{prefix},recycled_content_percentage,{_csv_field(dpp.recycled_content_percentage)}",
+        f"{prefix},co2_footprint_kg,{_csv_field(dpp.co2_footprint_kg)}",
+        f"{prefix},repair_score,{_csv_field(dpp.repair_score)}",
+    ]
+    for m in dpp.materials_composition:
+        lines.append(f"{prefix},{_csv_field('material:' + m.name)},{_csv_field(m.percentage)}")
+    lines.append("")
+    return Response(content="\r\n".join(lines), media_type="text/csv")
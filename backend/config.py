@@ -12,6 +12,7 @@ class Settings:
     AI_BACKEND: str = os.getenv("AI_BACKEND", "mock")  # 'mock' or 'openai'
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     DATA_DIR: str = os.getenv("DATA_DIR", "data")
+    SUPPLY_CHAIN_API_URL: str = os.getenv("SUPPLY_CHAIN_API_URL", "")  # empty -> mocked supplier data
     ALLOW_ORIGINS: List[str] = field(default_factory=lambda: os.getenv("ALLOW_ORIGINS", "http://localhost:8000,http://127.0.0.1:8000").split(","))
 
 settings = Settings()
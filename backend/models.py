@@ -1,11 +1,17 @@
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import Annotated, Any, Dict, List
 
-class Material(BaseModel):
+import msgspec
+
+# Structs don't validate on __init__; untrusted input goes through
+# msgspec.convert / msgspec.json.decode, which check types and constraints.
+# Both are frozen: fields live in slots (no per-instance __dict__) and a DPP
+# can't be changed after it has been built or handed out from a cache.
+
+class Material(msgspec.Struct, frozen=True, gc=False):
     name: str
-    percentage: float = Field(ge=0, le=100)
+    percentage: Annotated[float, msgspec.Meta(ge=0, le=100)]
 
-class DigitalProductPassport(BaseModel):
+class DigitalProductPassport(msgspec.Struct, frozen=True, gc=False):
     product_id: str
     product_name: str
     manufacturer: str
@@ -17,3 +23,9 @@ class DigitalProductPassport(BaseModel):
     supply_chain_partners: List[str] = []
     compliance_status: str = "unknown"
     espr_article_references: List[str] = []
+
+def load_trusted_dpp(d: Dict[str, Any]) -> DigitalProductPassport:
+    """Build a DPP from data we produced or already validated, skipping validation."""
+    fields = dict(d)
+    fields["materials_composition"] = [Material(**m) for m in d.get("materials_composition", [])]
+    return DigitalProductPassport(**fields)
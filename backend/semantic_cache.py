@@ -0,0 +1,140 @@
+"""
+Near-duplicate prompt cache for the OpenAI call sites.
+
+Prompts are normalized, shingled into 5-grams and indexed with MinHash LSH, so
+payloads that differ only by whitespace, casing or key order reuse a stored
+completion instead of making another round-trip. Entries are partitioned by
+`scope`: a hit is only returned for a prompt in the same scope, which callers
+use to pin the parts that must match exactly (product identity, question).
+
+datasketch is optional; without it lookups always miss.
+"""
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    from datasketch import MinHash, MinHashLSH
+except Exception:  # pragma: no cover
+    MinHash = None  # type: ignore
+    MinHashLSH = None  # type: ignore
+
+APP_DIR = Path(__file__).resolve().parent
+ROOT_DIR = APP_DIR.parent
+CACHE_PATH = ROOT_DIR / "data" / "semcache.pkl"
+
+THRESHOLD = 0.9
+NUM_PERM = 64
+SHINGLE_SIZE = 5
+MAX_ENTRIES = 10_000
+
+_lock = threading.Lock()
+_lsh = None
+_entries: "OrderedDict[str, Tuple[object, str]]" = OrderedDict()
+_seq = 0
+_hits = 0
+_misses = 0
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _minhash(text: str):
+    norm = _normalize(text)
+    m = MinHash(num_perm=NUM_PERM)
+    if len(norm) <= SHINGLE_SIZE:
+        m.update(norm.encode("utf-8"))
+        return m
+    for i in range(len(norm) - SHINGLE_SIZE + 1):
+        m.update(norm[i:i + SHINGLE_SIZE].encode("utf-8"))
+    return m
+
+
+def _ensure_index() -> bool:
+    global _lsh
+    if MinHashLSH is None:
+        return False
+    if _lsh is None:
+        _lsh = MinHashLSH(threshold=THRESHOLD, num_perm=NUM_PERM)
+    return True
+
+
+def lookup(prompt_text: str, scope: str = "default") -> Optional[str]:
+    """Return a stored completion for a near-duplicate prompt in `scope`, if any."""
+    global _hits, _misses
+    with _lock:
+        if not _ensure_index():
+            return None
+        if not _entries:
+            _misses += 1
+            return None
+        mh = _minhash(prompt_text)
+        prefix = f"{scope}\x00"
+        best, best_sim = None, 0.0
+        for key in _lsh.query(mh):
+            if not key.startswith(prefix):
+                continue
+            stored_mh, response = _entries[key]
+            sim = mh.jaccard(stored_mh)
+            if sim > best_sim:
+                best, best_sim = response, sim
+        if best is None:
+            _misses += 1
+        else:
+            _hits += 1
+        return best
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        lookups = _hits + _misses
+        return {
+            "enabled": MinHashLSH is not None,
+            "size": len(_entries),
+            "hits": _hits,
+            "misses": _misses,
+            "hit_rate": round(_hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def store(prompt_text: str, response: str, scope: str = "default") -> None:
+    global _seq
+    with _lock:
+        if not _ensure_index():
+            return
+        _seq += 1
+        key = f"{scope}\x00{_seq}"
+        mh = _minhash(prompt_text)
+        _lsh.insert(key, mh)
+        _entries[key] = (mh, response)
+        while len(_entries) > MAX_ENTRIES:
+            old_key, _ = _entries.popitem(last=False)
+            _lsh.remove(old_key)
+
+
+def load(path: Path = CACHE_PATH) -> None:
+    global _lsh, _entries, _seq
+    if MinHashLSH is None or not path.exists():
+        return
+    try:
+        with path.open("rb") as f:
+            state = pickle.load(f)
+    except Exception:
+        return
+    with _lock:
+        _lsh, _entries, _seq = state["lsh"], state["entries"], state["seq"]
+
+
+def save(path: Path = CACHE_PATH) -> None:
+    with _lock:
+        if _lsh is None or not _entries:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as f:
+            pickle.dump({"lsh": _lsh, "entries": _entries, "seq": _seq}, f)
+
+
+load()
@@ -0,0 +1,31 @@
+# Materialized view of compliance reports, keyed by product_id. Reports are
+# written through when a DPP is (re)processed and kept as encoded JSON, so the
+# report endpoint answers with a lookup and no serialization.
+from typing import Any, Dict, Optional, Union
+
+import msgspec
+
+from ..cache import LRUCache
+from ..models import DigitalProductPassport
+from .data_validator import _K_PID, check_espr_compliance
+
+MAX_REPORTS = 100_000
+
+_ENC = msgspec.json.Encoder()
+_REPORTS = LRUCache(maxsize=MAX_REPORTS)
+
+
+def refresh(dpp: Union[Dict[str, Any], DigitalProductPassport]) -> bytes:
+    """Recompute and store the report for `dpp`; returns the encoded report."""
+    report = check_espr_compliance(dpp)
+    body = _ENC.encode(report)
+    _REPORTS.put(report[_K_PID], body)
+    return body
+
+
+def get(product_id: str) -> Optional[bytes]:
+    return _REPORTS.get(product_id)
+
+
+def stats() -> Dict[str, Any]:
+    return _REPORTS.stats()
@@ -1,32 +1,49 @@
-from typing import Dict, Any, List
-
-def check_espr_compliance(dpp: Dict[str, Any]) -> Dict[str, Any]:
-    issues: List[str] = []
-    warnings: List[str] = []
-
-    materials = dpp.get("materials_composition", [])
-    recycled = dpp.get("recycled_content_percentage", 0.0)
-    co2 = dpp.get("co2_footprint_kg", 0.0)
-    repair = dpp.get("repair_score", "N/A")
-    instructions = dpp.get("recycling_instructions", "")
-
-    if not materials:
-        issues.append("Missing materials composition.")
-    if recycled == 0.0:
-        warnings.append("Recycled content not specified or zero.")
-    if co2 == 0.0:
-        warnings.append("CO2 footprint not specified.")
-    if not instructions:
-        issues.append("Recycling instructions required.")
-    if repair in ("N/A", "", None):
-        warnings.append("Repair score not provided.")
-
-    status = "non_compliant" if issues else "partially_compliant" if warnings else "compliant"
+import sys
+from functools import partial
+from typing import Dict, Any, List, Union
+
+from ..models import DigitalProductPassport
+
+# Field names, interned once so dict lookups and getattr hit the identity fast
+# path. The rest of the validation code (data_validator_fast, dpp_table,
+# compliance_cache) imports these rather than repeating the literals.
+_K_PID = sys.intern("product_id")
+_K_MAT = sys.intern("materials_composition")
+_K_INS = sys.intern("recycling_instructions")
+_K_REC = sys.intern("recycled_content_percentage")
+_K_CO2 = sys.intern("co2_footprint_kg")
+_K_REP = sys.intern("repair_score")
+_K_ESPR = sys.intern("espr_article_references")
+
+_MISSING_REPAIR = frozenset(("N/A", "", None))
+
+# (field, default, predicate, message): a rule fires when predicate(value) is true
+_ISSUE_RULES = (
+    (_K_MAT, [], lambda v: not v, "Missing materials composition."),
+    (_K_INS, "", lambda v: not v, "Recycling instructions required."),
+)
+_WARN_RULES = (
+    (_K_REC, 0.0, lambda v: v == 0.0, "Recycled content not specified or zero."),
+    (_K_CO2, 0.0, lambda v: v == 0.0, "CO2 footprint not specified."),
+    (_K_REP, "N/A", lambda v: v in _MISSING_REPAIR, "Repair score not provided."),
+)
+
+# Indexed by bool(warnings) + 2 * bool(issues)
+_STATUS = ("compliant", "partially_compliant", "non_compliant", "non_compliant")
+
+def _getter(dpp: Union[Dict[str, Any], DigitalProductPassport]):
+    # Stored DPPs arrive as dicts, freshly built ones as structs (attribute access)
+    return dpp.get if isinstance(dpp, dict) else partial(getattr, dpp)
+
+def check_espr_compliance(dpp: Union[Dict[str, Any], DigitalProductPassport]) -> Dict[str, Any]:
+    get = _getter(dpp)
+    issues: List[str] = [msg for k, default, pred, msg in _ISSUE_RULES if pred(get(k, default))]
+    warnings: List[str] = [msg for k, default, pred, msg in _WARN_RULES if pred(get(k, default))]
 
     return {
-        "product_id": dpp.get("product_id"),
-        "status": status,
+        _K_PID: get(_K_PID),
+        "status": _STATUS[bool(warnings) + 2 * bool(issues)],
         "issues": issues,
         "warnings": warnings,
-        "espr_article_references": dpp.get("espr_article_references", []),
+        _K_ESPR: get(_K_ESPR, []),
     }
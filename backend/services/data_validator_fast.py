@@ -0,0 +1,84 @@
+"""
+Bulk ESPR status scoring for dashboard views that rate many DPPs at once.
+
+Gives the same status as check_espr_compliance, but only the status: each DPP
+becomes one row of rule flags (evaluated from data_validator's own rule
+tables, issues first, then warnings) and the whole matrix is scored in a
+single call (a Numba kernel when available, vectorized numpy otherwise).
+Single-record reports that need issue/warning messages still use
+check_espr_compliance.
+"""
+from typing import Any, List, Sequence, Tuple
+
+from .data_validator import _ISSUE_RULES, _STATUS, _WARN_RULES, _getter
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None  # type: ignore
+
+try:
+    from numba import njit
+except Exception:  # pragma: no cover
+    njit = None  # type: ignore
+
+COMPLIANT, PARTIALLY_COMPLIANT, NON_COMPLIANT = 0, 1, 2
+
+RULES = _ISSUE_RULES + _WARN_RULES
+N_ISSUE_RULES = len(_ISSUE_RULES)
+
+
+def rule_flags(dpp: Any) -> Tuple[bool, ...]:
+    """Whether each rule in RULES fires for `dpp` (dict or struct)."""
+    get = _getter(dpp)
+    return tuple(bool(pred(get(k, default))) for k, default, pred, _ in RULES)
+
+
+def _score_batch_np(flags, n_issue):
+    status = flags[:, n_issue:].any(axis=1).astype(np.int8)
+    status[flags[:, :n_issue].any(axis=1)] = NON_COMPLIANT
+    return status
+
+
+if njit is not None:
+    # Serial on purpose: a parallel kernel called from a non-main thread (the
+    # event loop under TestClient, the thread pool) leaves Numba's threading
+    # layer hanging the process at exit, and the loop is memory-bound anyway.
+    @njit(cache=True)
+    def _score_batch_jit(flags, n_issue):
+        n, n_rules = flags.shape
+        out = np.zeros(n, dtype=np.int8)
+        for i in range(n):
+            for j in range(n_rules):
+                if flags[i, j]:
+                    if j < n_issue:
+                        out[i] = 2
+                        break
+                    out[i] = 1
+        return out
+else:
+    _score_batch_jit = None
+
+
+def score_batch(flags):
+    """
+    int8 status per row of an (n, len(RULES)) bool flag matrix:
+    0 compliant, 1 partially compliant, 2 non-compliant.
+    """
+    if _score_batch_jit is not None:
+        return _score_batch_jit(flags, N_ISSUE_RULES)
+    return _score_batch_np(flags, N_ISSUE_RULES)
+
+
+def flag_matrix(dpps: Sequence[Any]):
+    return np.array([rule_flags(d) for d in dpps], dtype=np.bool_).reshape(len(dpps), len(RULES))
+
+
+def compliance_statuses(dpps: Sequence[Any]) -> List[str]:
+    """Status name for each DPP (dicts or structs), in input order."""
+    if not dpps:
+        return []
+    if np is None:
+        from .data_validator import check_espr_compliance
+        return [check_espr_compliance(d)["status"] for d in dpps]
+    return [_STATUS[s] for s in score_batch(flag_matrix(dpps)).tolist()]
@@ -0,0 +1,86 @@
+"""
+Columnar in-memory copy of the compliance-relevant state of every DPP, for
+scan-heavy queries.
+
+Each row holds the rule flags from data_validator_fast.rule_flags (one bool
+column per validator rule) in a single contiguous matrix, so a compliance sweep
+over every stored DPP is one score_batch call instead of a loop over scattered
+objects. Rows are upserted by product id on ingest; the matrix grows by
+doubling, so appends are amortized O(1).
+
+pyarrow is optional and only needed for Parquet export.
+"""
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from .data_validator import _K_PID, _STATUS, _getter
+from .data_validator_fast import RULES, rule_flags, score_batch
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover
+    pa = None  # type: ignore
+    pq = None  # type: ignore
+
+
+class DPPTable:
+    def __init__(self, capacity: int = 1024):
+        self.product_ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._flags = np.zeros((capacity, len(RULES)), dtype=np.bool_)
+
+    def __len__(self) -> int:
+        return len(self.product_ids)
+
+    def __contains__(self, product_id: str) -> bool:
+        return product_id in self._rows
+
+    def upsert(self, dpp: Any) -> None:
+        """Insert or overwrite the row for a DPP (dict or struct)."""
+        product_id = _getter(dpp)(_K_PID)
+        flags = rule_flags(dpp)
+        with self._lock:
+            row = self._rows.get(product_id)
+            if row is None:
+                row = len(self.product_ids)
+                if row == len(self._flags):
+                    grown = np.zeros((2 * len(self._flags), len(RULES)), dtype=np.bool_)
+                    grown[:row] = self._flags
+                    self._flags = grown
+                self.product_ids.append(product_id)
+                self._rows[product_id] = row
+            self._flags[row] = flags
+
+    def _snapshot(self) -> Tuple[List[str], np.ndarray]:
+        # Copies taken under the lock; scoring runs outside it
+        with self._lock:
+            n = len(self.product_ids)
+            return list(self.product_ids), self._flags[:n].copy()
+
+    def scan(self) -> Dict[str, Any]:
+        product_ids, flags = self._snapshot()
+        codes = score_batch(flags)
+        counts = np.bincount(codes, minlength=3)
+        return {
+            "product_ids": product_ids,
+            "statuses": [_STATUS[c] for c in codes.tolist()],
+            "counts": {_STATUS[code]: int(counts[code]) for code in range(3)},
+        }
+
+    def to_arrow(self):
+        if pa is None:
+            raise RuntimeError("pyarrow is not installed")
+        product_ids, flags = self._snapshot()
+        # One column per rule, named after the field it checks
+        cols = {_K_PID: product_ids, "status": score_batch(flags)}
+        for j, (key, _, _, _) in enumerate(RULES):
+            cols[f"{key}_flagged"] = flags[:, j]
+        return pa.table(cols)
+
+    def to_parquet(self, path: Path) -> None:
+        pq.write_table(self.to_arrow(), str(path))
@@ -1,16 +1,74 @@
-# Placeholder stubs for supply chain API integration
-from typing import List, Dict
-
-def get_suppliers(product_id: str) -> List[Dict]:
-    # Mocked data
-    return [
-        {"name": "Acme Textiles Ltd", "country": "PT", "role": "fabric"},
-        {"name": "EcoPack Co", "country": "DE", "role": "packaging"},
-    ]
-
-def get_traceability_record(product_id: str) -> Dict:
-    return {
-        "product_id": product_id,
-        "chain_of_custody": ["Supplier A", "Supplier B", "Warehouse", "Retail"],
-        "last_updated": "2025-01-12",
-    }
+# Supply chain API integration. Calls SUPPLY_CHAIN_API_URL through a shared
+# client when configured; otherwise returns mocked data.
+from typing import Dict, Optional, Sequence
+from urllib.parse import quote
+
+import httpx
+
+from ..cache import LRUCache
+from ..config import settings
+
+REQUEST_TIMEOUT = httpx.Timeout(2.0)
+
+# Mocked data is built once and shared by every call. Tuples rather than
+# MappingProxyType so orjson/msgspec can still serialize them; treat as read-only.
+_MOCK_SUPPLIERS = (
+    {"name": "Acme Textiles Ltd", "country": "PT", "role": "fabric"},
+    {"name": "EcoPack Co", "country": "DE", "role": "packaging"},
+)
+_MOCK_CHAIN = ("Supplier A", "Supplier B", "Warehouse", "Retail")
+_MOCK_LAST_UPDATED = "2025-01-12"
+
+# Supplier data changes rarely; serve repeats from memory for a few minutes
+_SUPPLIER_CACHE = LRUCache(maxsize=1024, ttl=300)
+_TRACE_CACHE = LRUCache(maxsize=1024, ttl=300)
+
+
+def invalidate(product_id: str) -> None:
+    _SUPPLIER_CACHE.pop(product_id)
+    _TRACE_CACHE.pop(product_id)
+
+
+def create_http_client() -> httpx.AsyncClient:
+    # One pooled client per process so TCP/TLS connections are reused across requests
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30),
+        timeout=REQUEST_TIMEOUT,
+    )
+
+
+async def _get_json(session: httpx.AsyncClient, product_id: str, resource: str):
+    # product_id arrives percent-decoded; re-quote it so "?", "/" or "#" can't
+    # reshape the upstream URL
+    url = f"{settings.SUPPLY_CHAIN_API_URL.rstrip('/')}/products/{quote(product_id, safe='')}/{resource}"
+    r = await session.get(url)
+    r.raise_for_status()
+    try:
+        return r.json()
+    except ValueError as e:
+        # Surface a malformed body like any other upstream failure (callers map HTTPError to 502)
+        raise httpx.DecodingError(f"Invalid JSON from {url}: {e}", request=r.request) from e
+
+
+def _use_api(session: Optional[httpx.AsyncClient]) -> bool:
+    return session is not None and bool(settings.SUPPLY_CHAIN_API_URL)
+
+
+async def get_suppliers(product_id: str, session: Optional[httpx.AsyncClient] = None) -> Sequence[Dict]:
+    if not _use_api(session):
+        return _MOCK_SUPPLIERS
+    cached = _SUPPLIER_CACHE.get(product_id)
+    if cached is None:
+        cached = await _get_json(session, product_id, "suppliers")
+        _SUPPLIER_CACHE.put(product_id, cached)
+    return cached
+
+
+async def get_traceability_record(product_id: str, session: Optional[httpx.AsyncClient] = None) -> Dict:
+    if not _use_api(session):
+        return {"product_id": product_id, "chain_of_custody": _MOCK_CHAIN, "last_updated": _MOCK_LAST_UPDATED}
+    cached = _TRACE_CACHE.get(product_id)
+    if cached is None:
+        cached = await _get_json(session, product_id, "traceability")
+        _TRACE_CACHE.put(product_id, cached)
+    return cached
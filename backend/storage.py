@@ -0,0 +1,74 @@
+# On-disk format for processed DPPs: one msgpack file per product, decoded
+# straight into DigitalProductPassport. Files written before the switch are
+# plain JSON and are still read.
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import msgspec
+
+from .models import DigitalProductPassport
+
+SCHEMA_VERSION = 1
+DPP_SUFFIX = ".msgpack"
+LEGACY_SUFFIX = ".json"
+META_NAME = ".meta"
+
+logger = logging.getLogger(__name__)
+
+_PACK = msgspec.msgpack.Encoder()
+_UNPACK = msgspec.msgpack.Decoder(DigitalProductPassport)
+_LEGACY = msgspec.json.Decoder(DigitalProductPassport)
+
+
+def dpp_path(directory: Path, product_id: str) -> Path:
+    return directory / f"{product_id}{DPP_SUFFIX}"
+
+
+def encode_dpp(dpp: DigitalProductPassport) -> bytes:
+    return _PACK.encode(dpp)
+
+
+def is_reserved_id(product_id: str) -> bool:
+    """Ids that can't name a stored DPP: empty, hidden/internal files, or path-like."""
+    return not product_id or product_id.startswith(("_", ".")) or "/" in product_id or "\\" in product_id
+
+
+def read_dpp(directory: Path, product_id: str) -> Optional[DigitalProductPassport]:
+    """
+    Load a stored DPP, falling back to the legacy JSON file. None if there is no
+    such DPP: missing, a reserved name (_index etc.), or a file that doesn't decode.
+    """
+    if is_reserved_id(product_id):
+        return None
+    for path, decoder in (
+        (dpp_path(directory, product_id), _UNPACK),
+        (directory / f"{product_id}{LEGACY_SUFFIX}", _LEGACY),
+    ):
+        try:
+            return decoder.decode(path.read_bytes())
+        except FileNotFoundError:
+            continue
+        except msgspec.DecodeError:
+            logger.warning("Stored DPP %s does not decode", path, exc_info=True)
+            return None
+    return None
+
+
+def iter_product_ids(directory: Path) -> Iterator[str]:
+    """Ids of every stored DPP, msgpack or legacy JSON (files starting with '_' are not DPPs)."""
+    seen = set()
+    for pattern in (f"*{DPP_SUFFIX}", f"*{LEGACY_SUFFIX}"):
+        for fp in directory.glob(pattern):
+            if fp.stem.startswith("_") or fp.stem in seen:
+                continue
+            seen.add(fp.stem)
+            yield fp.stem
+
+
+def meta() -> Dict[str, Any]:
+    return {"format": "msgpack", "schema_version": SCHEMA_VERSION}
+
+
+def write_meta(directory: Path) -> None:
+    (directory / META_NAME).write_bytes(msgspec.json.encode(meta()))
@@ -173,12 +173,12 @@ async function sendChat() {
   appendMsg('ai', data.answer || 'No answer available.');
 }
 
-// Export CSV (download from JSON response)
+// Export CSV
 async function exportCsv() {
   if (!lastProductId) { setStatus('Process a product first.'); return; }
   const r = await fetch(`/api/product/${lastProductId}/export.csv`);
-  const data = await r.json();
-  const blob = new Blob([data.csv], {type: 'text/csv;charset=utf-8;'});
+  const csv = await r.text();
+  const blob = new Blob([csv], {type: 'text/csv;charset=utf-8;'});
   const a = document.createElement('a');
   a.href = URL.createObjectURL(blob);
   a.download = `${lastProductId}.csv`;
@@ -0,0 +1,27 @@
+import argparse, sys
+from pathlib import Path
+
+import msgspec
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from backend import storage  # noqa: E402
+
+PROC = ROOT / "data" / "processed_dpp"
+
+parser = argparse.ArgumentParser(description="Dump stored DPPs (msgpack) as readable JSON.")
+parser.add_argument("--export-json", metavar="OUT_DIR", type=Path, required=True,
+                    help="directory to write {product_id}.json files into")
+args = parser.parse_args()
+
+args.export_json.mkdir(parents=True, exist_ok=True)
+count = 0
+for product_id in storage.iter_product_ids(PROC):
+    dpp = storage.read_dpp(PROC, product_id)
+    if dpp is None:
+        continue
+    (args.export_json / f"{product_id}.json").write_bytes(msgspec.json.format(msgspec.json.encode(dpp), indent=2))
+    count += 1
+
+print(f"Exported {count} DPP(s) to {args.export_json}")
@@ -1,7 +1,11 @@
-import os, json, shutil
+import compileall, os, json, shutil, sys
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from backend import storage  # noqa: E402
+
 DATA = ROOT / "data"
 RAW = DATA / "raw_supplier_data"
 PROC = DATA / "processed_dpp"
@@ -10,9 +14,21 @@ DOCS = DATA / "regulatory_docs"
 for d in (DATA, RAW, PROC, DOCS):
     d.mkdir(parents=True, exist_ok=True)
 
-# create a couple of tiny regulatory snippets
-(DOCS / "ESPR_Article_1.txt").write_text("Products must contain clear material composition and recycled content.", encoding="utf-8")
-(DOCS / "ESPR_Article_2.txt").write_text("CO2 footprint reporting should be provided in kg CO2e with methodology.", encoding="utf-8")
-(DOCS / "ESPR_Article_3.txt").write_text("Provide repairability and end-of-life recycling instructions.", encoding="utf-8")
+# record the on-disk DPP format so later schema changes can be detected
+storage.write_meta(PROC)
+
+# create a couple of tiny regulatory snippets (files already up to date are left alone)
+SNIPPETS = [
+    (DOCS / "ESPR_Article_1.txt", "Products must contain clear material composition and recycled content."),
+    (DOCS / "ESPR_Article_2.txt", "CO2 footprint reporting should be provided in kg CO2e with methodology."),
+    (DOCS / "ESPR_Article_3.txt", "Provide repairability and end-of-life recycling instructions."),
+]
+for path, text in SNIPPETS:
+    content = text.encode("utf-8")
+    if not path.exists() or path.read_bytes() != content:
+        path.write_bytes(content)
+
+# byte-compile the backend now so the first server start doesn't pay for it
+compileall.compile_dir(str(ROOT / "backend"), quiet=1)
 
 print("Environment ready. Data directories created.")
@@ -1,8 +1,27 @@
+import csv
+import io
+import json
+
+import httpx
+import pytest
 from fastapi.testclient import TestClient
+
+from backend import app as app_module
 from backend.app import app
 
 client = TestClient(app)
 
+@pytest.fixture(autouse=True)
+def data_dirs(tmp_path, monkeypatch):
+    # Keep test products out of the real data/ directory
+    processed, raw = tmp_path / "processed_dpp", tmp_path / "raw_supplier_data"
+    processed.mkdir()
+    raw.mkdir()
+    monkeypatch.setattr(app_module, "PROCESSED_DIR", processed)
+    monkeypatch.setattr(app_module, "RAW_DIR", raw)
+    monkeypatch.setattr(app_module, "INDEX_PATH", processed / "_index.json")
+    return processed
+
 def test_process_product_and_fetch():
     payload = {
         "product_name": "EcoPhone X",
@@ -24,3 +43,120 @@ def test_process_product_and_fetch():
     assert r3.status_code == 200
     report = r3.json()
     assert "status" in report
+
+    r4 = client.get(f"/api/product/{pid}/dpp?embed=true")
+    assert r4.status_code == 200
+    embedded = r4.json()
+    assert embedded["dpp"] == dpp
+    assert embedded["compliance"] == report
+    assert embedded["suppliers"]
+
+def test_process_products_batch():
+    payload = [
+        {"product_name": "Eco Tee", "description": "Cotton 60%, Polyester 40%. CO2 2.4 kg CO2e."},
+        {"product_name": "EcoPhone X", "bom_text": "Aluminium 40%; Glass 60%."},
+    ]
+    r = client.post("/api/process-products:batch", json=payload)
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert [res["dpp"]["product_name"] for res in results] == ["Eco Tee", "EcoPhone X"]
+
+    # batch_size bounds concurrency, not the array; order is preserved either way
+    r2 = client.post("/api/process-products:batch?batch_size=1", json=payload)
+    assert r2.status_code == 200
+    assert [res["dpp"]["product_name"] for res in r2.json()["results"]] == ["Eco Tee", "EcoPhone X"]
+
+    r3 = client.post("/api/process-products:batch", json=payload * 33)
+    assert r3.status_code == 413
+
+def test_legacy_json_dpp_is_still_served(data_dirs):
+    legacy = {"product_id": "legacy-json", "product_name": "Old Kettle", "manufacturer": "Acme"}
+    (data_dirs / "legacy-json.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    r = client.get("/api/product/legacy-json/dpp")
+    assert r.status_code == 200
+    assert r.json()["product_name"] == "Old Kettle"
+
+def test_reserved_and_undecodable_files_are_not_dpps(data_dirs):
+    (data_dirs / "_index.json").write_text("{}", encoding="utf-8")
+    (data_dirs / "broken.msgpack").write_bytes(b"not msgpack")
+
+    assert client.get("/api/product/_index/dpp").status_code == 404
+    assert client.get("/api/product/broken/dpp").status_code == 404
+    r = client.post("/api/process-product", json={"product_id": "_index", "product_name": "X"})
+    assert r.status_code == 400
+
+def test_compliance_scan():
+    r = client.post("/api/process-product", json={"product_name": "Scan Tee", "description": "Cotton 100%."})
+    pid = r.json()["product_id"]
+    report = client.get(f"/api/product/{pid}/compliance-report").json()
+
+    scan = client.get("/api/compliance/scan").json()
+    assert scan["total"] == sum(scan["counts"].values())
+    assert {"product_id": pid, "status": report["status"]} in scan["products"]
+
+    filtered = client.get(f"/api/compliance/scan?status={report['status']}").json()
+    assert all(p["status"] == report["status"] for p in filtered["products"])
+
+def test_compliance_report_follows_reprocessing():
+    payload = {"product_id": "report-refresh", "product_name": "Kettle", "description": "Steel 100%."}
+    client.post("/api/process-product", json=payload)
+    before = client.get("/api/product/report-refresh/compliance-report").json()
+    assert before["warnings"]
+
+    payload["description"] = "Steel 100%. Recycled content 30%. CO2 4.2 kg CO2e."
+    payload["repair_score"] = "8"
+    client.post("/api/process-product", json=payload)
+    after = client.get("/api/product/report-refresh/compliance-report").json()
+    assert after["status"] == "compliant"
+    assert after["warnings"] == []
+
+def test_index_reconciles_with_files_on_startup(data_dirs, monkeypatch):
+    monkeypatch.setattr(app_module, "_INDEX", {})
+    monkeypatch.setattr(app_module.semantic_cache, "save", lambda: None)
+    stale = {"deleted": {"product_id": "deleted", "product_name": "Gone"}}
+    (data_dirs / "_index.json").write_text(json.dumps(stale), encoding="utf-8")
+    legacy = {"product_id": "on-disk", "product_name": "Kept", "manufacturer": "Acme"}
+    (data_dirs / "on-disk.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    with TestClient(app) as started:
+        products = started.get("/api/products/").json()["products"]
+    assert products == [{"product_id": "on-disk", "product_name": "Kept"}]
+
+def test_export_csv_quotes_fields():
+    payload = {"product_name": 'Tee, "Classic"', "manufacturer": "Green, Threads", "description": "Cotton 100%."}
+    pid = client.post("/api/process-product", json=payload).json()["product_id"]
+
+    r = client.get(f"/api/product/{pid}/export.csv")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(r.text)))
+    assert rows[0] == ["product_id", "product_name", "manufacturer", "metric", "value"]
+    assert rows[1][:3] == [pid, 'Tee, "Classic"', "Green, Threads"]
+    assert ["material:Cotton", "100.0"] in [row[3:] for row in rows[1:]]
+
+def test_supply_chain():
+    r = client.get("/api/product/any-product/supply-chain")
+    assert r.status_code == 200
+    data = r.json()
+    assert data["product_id"] == "any-product"
+    assert data["suppliers"]
+    assert data["traceability"]["product_id"] == "any-product"
+
+def test_supply_chain_upstream_url_and_errors(monkeypatch):
+    from backend.services import supply_chain_api
+
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.raw_path)
+        if request.url.path.endswith("/suppliers"):
+            return httpx.Response(200, content=b"not json")
+        return httpx.Response(200, json={"chain_of_custody": []})
+
+    monkeypatch.setattr(supply_chain_api.settings, "SUPPLY_CHAIN_API_URL", "http://upstream.test")
+    monkeypatch.setattr(app.state, "http", httpx.AsyncClient(transport=httpx.MockTransport(handler)), raising=False)
+
+    r = client.get("/api/product/abc%3Fx/supply-chain")
+    assert r.status_code == 502
+    assert b"/products/abc%3Fx/suppliers" in seen
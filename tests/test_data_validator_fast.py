@@ -0,0 +1,54 @@
+import itertools
+
+from backend.models import DigitalProductPassport, Material
+from backend.services.data_validator import check_espr_compliance
+from backend.services.data_validator_fast import N_ISSUE_RULES, _score_batch_np, compliance_statuses, flag_matrix, score_batch
+
+def _sample_dpps():
+    dpps = []
+    combos = itertools.product(
+        ([], [{"name": "Cotton", "percentage": 100.0}]),
+        ("", "Recycle fabric."),
+        (0.0, 25.0),
+        (0.0, 2.4),
+        ("N/A", "", "7"),
+    )
+    for i, (mats, instr, recycled, co2, repair) in enumerate(combos):
+        dpps.append({
+            "product_id": f"p{i}",
+            "materials_composition": mats,
+            "recycling_instructions": instr,
+            "recycled_content_percentage": recycled,
+            "co2_footprint_kg": co2,
+            "repair_score": repair,
+        })
+    dpps.append({"product_id": "sparse"})
+    return dpps
+
+def test_statuses_match_check_espr_compliance():
+    dpps = _sample_dpps()
+    assert compliance_statuses(dpps) == [check_espr_compliance(d)["status"] for d in dpps]
+
+    structs = [
+        DigitalProductPassport("s1", "Tee", "Acme", [Material("Cotton", 100.0)], 25.0, 2.4, "7", "Recycle."),
+        DigitalProductPassport("s2", "Tee", "Acme"),
+    ]
+    assert compliance_statuses(structs) == [check_espr_compliance(d)["status"] for d in structs]
+
+def test_jit_and_numpy_kernels_agree():
+    flags = flag_matrix(_sample_dpps())
+    assert score_batch(flags).tolist() == _score_batch_np(flags, N_ISSUE_RULES).tolist()
+
+def test_table_scan_matches_check_espr_compliance():
+    from backend.services.dpp_table import DPPTable
+
+    dpps = _sample_dpps()
+    table = DPPTable(capacity=2)
+    for d in dpps:
+        table.upsert(d)
+    table.upsert({"product_id": "p0", "recycling_instructions": "x"})
+    dpps[0] = {"product_id": "p0", "recycling_instructions": "x"}
+
+    scan = table.scan()
+    assert scan["product_ids"] == [d["product_id"] for d in dpps]
+    assert scan["statuses"] == [check_espr_compliance(d)["status"] for d in dpps]